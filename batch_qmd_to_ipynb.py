@@ -7,12 +7,22 @@ Features:
 - Clean headings & layout blocks removal
 - Guarantees every code cell has "outputs": [] and "execution_count": null
 - Batch processing with nice feedback
+- Re-runs skip sources whose content hash is unchanged (.convcache.json)
 """
 
+import os
 import re
 import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
 # ------------------- Banner -------------------
 BANNER = {
     "cell_type": "markdown",
@@ -52,66 +62,161 @@ DRIVE_CODE = {
 
 SEPARATOR = {"cell_type": "markdown", "metadata": {}, "source": ["", "---", ""]}
 
+SETUP_CELLS = (RPY2_MD, RPY2_CODE, DRIVE_MD, DRIVE_CODE, SEPARATOR)
+
+NOTEBOOK_METADATA = {
+    "kernelspec": {"display_name": "R", "language": "R", "name": "ir"},
+    "colab": {"toc_visible": True}
+}
+
+# ------------------- JSON encoding -------------------
+def dumps(obj) -> bytes:
+    """Compact UTF-8 JSON, like repair_notebooks writes.
+
+    With indent= set the stdlib falls back to its pure-Python encoder, so
+    output stays compact on both the orjson and the stdlib path.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode("utf-8")
+
+def dump_notebook(cells) -> bytes:
+    """Encode a complete notebook around cells in one dumps() call."""
+    return dumps({
+        "cells": cells,
+        "metadata": NOTEBOOK_METADATA,
+        "nbformat": 4,
+        "nbformat_minor": 5
+    })
+
 # ------------------- Regexes -------------------
-CHUNK_RE = re.compile(
-    r"^(?P<indent>[ \t]*)```\{?\s*(?P<engine>[a-zA-Z0-9_+.-]*)\b(?P<options>.*?)\n(?P<code>[\s\S]*?)\n(?P=indent)```",
-    re.MULTILINE
-)
-LAYOUT_BLOCK_RE = re.compile(r":::\s*\{layout-ncol.*?:::", re.DOTALL)
+FENCE = "```"
+ENGINE_RE = re.compile(r"[a-zA-Z0-9_+.-]*")
+LAYOUT_FENCE = ":::"
+LAYOUT_OPEN = "{layout-ncol"
+# str.splitlines() boundaries other than \n (\r is translated on read)
+LINE_BREAK_RE = re.compile(r"[\x0b\x0c\x1c-\x1e\x85\u2028\u2029]")
+HEADING_RE = re.compile(r"^[^\S\n]*#+[^\S\n]+(?=\S)", re.MULTILINE)
+TRAILING_WS_RE = re.compile(r"[^\S\n]+$", re.MULTILINE)
+SKIPPED_BLOCK_RE = re.compile(r"[^\S\n]*## (?:Original Notebook Starts Here|Overview)")
 
 # ------------------- Helpers -------------------
-def split_headings(lines):
-    blocks = []
-    current = []
-    for line in lines:
-        line = line.rstrip()
-        if re.match(r"^\s*#+\s+", line) and current:
-            blocks.append("\n".join(current))
-            current = [line]
-        else:
-            current.append(line)
-    if current:
-        blocks.append("\n".join(current))
+def split_headings(text: str):
+    """Split a markdown slice at headings; each block is returned as a list of lines."""
+    # Break lines where splitlines() does, so headings and blocks agree with it
+    text = TRAILING_WS_RE.sub("", LINE_BREAK_RE.sub("\n", text))
+    # finditer from offset 1: a heading on the very first line opens the first block
+    bounds = [0]
+    bounds.extend(m.start() for m in HEADING_RE.finditer(text, 1))
+    bounds.append(len(text))
+
+    blocks = (text[start:end].rstrip() for start, end in zip(bounds, bounds[1:]))
+    return [b.splitlines() for b in filter(None, blocks) if not SKIPPED_BLOCK_RE.match(b)]
 
-    cleaned = []
-    for b in blocks:
-        if b.strip().startswith(("## Original Notebook Starts Here", "## Overview")):
+def remove_layout_blocks(content: str) -> str:
+    """Drop ::: {layout-ncol...} ... ::: blocks in one linear str.find pass.
+
+    Same result as re.sub(r":::\\s*\\{layout-ncol.*?:::", "", content, flags=re.DOTALL),
+    which rescans to the end of the text for every unclosed opener.
+    """
+    kept = []
+    pos = search = 0
+    while True:
+        i = content.find(LAYOUT_FENCE, search)
+        if i < 0:
+            break
+        j = i + len(LAYOUT_FENCE)
+        while j < len(content) and content[j].isspace():
+            j += 1
+        if not content.startswith(LAYOUT_OPEN, j):
+            search = i + 1
             continue
-        cleaned.append(b.rstrip())
-    return [b for b in cleaned if b.strip()]
-
-def ensure_code_cell_structure(cell):
-    """Force correct empty output fields – essential for Colab"""
-    if cell.get("cell_type") == "code":
-        if "outputs" not in cell:
-            cell["outputs"] = []
-        if "execution_count" not in cell:
-            cell["execution_count"] = None
-    return cell
+        close = content.find(LAYOUT_FENCE, j + len(LAYOUT_OPEN))
+        if close < 0:
+            break  # no closing fence after this opener, so none after any later one
+        kept.append(content[pos:i])
+        pos = search = close + len(LAYOUT_FENCE)
+    if not kept:
+        return content
+    kept.append(content[pos:])
+    return "".join(kept)
+
+def _is_boundary(text: str, i: int) -> bool:
+    """Regex \\b: exactly one side of offset i is a word character."""
+    before = i > 0 and (text[i - 1].isalnum() or text[i - 1] == "_")
+    after = i < len(text) and (text[i].isalnum() or text[i] == "_")
+    return before != after
+
+def _match_chunk(content: str, start: int, indent: str, i: int):
+    """Match one chunk whose opening fence ends at offset i, or return None."""
+    if content.startswith("{", i):
+        i += 1
+    ws_end = i
+    while ws_end < len(content) and content[ws_end].isspace():
+        ws_end += 1
+
+    close = "\n" + indent + FENCE
+    failed_nl = None
+    # Longest whitespace run first, then shorter ones (the regex's backtracking order)
+    for k in range(ws_end, i - 1, -1):
+        engine_end = ENGINE_RE.match(content, k).end()
+        while engine_end > k and not _is_boundary(content, engine_end):
+            engine_end -= 1
+        if not _is_boundary(content, engine_end):
+            continue
+        nl = content.find("\n", engine_end)
+        if nl < 0 or nl == failed_nl:
+            continue
+        q = content.find(close, nl + 1)
+        if q < 0:
+            failed_nl = nl
+            continue
+        return (start, q + len(close), content[k:engine_end],
+                content[engine_end:nl], content[nl + 1:q])
+    return None
+
+def iter_chunks(content: str):
+    """Yield (start, end, engine, options, code) for every fenced code chunk.
+
+    Linear str.find-based scanner: fences are paired exactly as the former
+    CHUNK_RE regex paired them, but without backtracking over chunk bodies.
+    """
+    pos = 0
+    while True:
+        idx = content.find(FENCE, pos)
+        if idx < 0:
+            return
+        line_start = content.rfind("\n", 0, idx) + 1
+        indent = content[line_start:idx]
+        chunk = None
+        if line_start >= pos and not indent.strip(" \t"):
+            chunk = _match_chunk(content, line_start, indent, idx + len(FENCE))
+        if chunk is None:
+            pos = idx + 1
+            continue
+        yield chunk
+        pos = chunk[1]
 
 # ------------------- Core conversion -------------------
 def qmd_to_cells(content: str):
-    content = LAYOUT_BLOCK_RE.sub("", content)
+    content = remove_layout_blocks(content)
     cells = [BANNER]
     pos = 0
     first_r_chunk_found = False
-
-    for m in CHUNK_RE.finditer(content):
+    for start, end, engine, options_str, code in iter_chunks(content):
         # Markdown before chunk
-        md_text = content[pos:m.start()].strip()
+        md_text = content[pos:start].strip()
         if md_text:
-            for block in split_headings(md_text.splitlines()):
-                if block.strip():
-                    cells.append(ensure_code_cell_structure({
-                        "cell_type": "markdown",
-                        "metadata": {},
-                        "source": block.splitlines()
-                    }))
+            for block_lines in split_headings(md_text):
+                cells.append({
+                    "cell_type": "markdown",
+                    "metadata": {},
+                    "source": block_lines
+                })
 
         # Code chunk
-        engine = m.group("engine").strip().lower()
-        options_str = m.group("options")
-        code = m.group("code").rstrip()
+        engine = engine.strip().lower()
+        code_lines = code.rstrip().splitlines()
 
         option_comments = [
             p.strip() for p in re.split(r',\s*', options_str.strip())
@@ -121,15 +226,15 @@ def qmd_to_cells(content: str):
         is_r = engine in {"r", ""} or engine.startswith("r")
 
         if is_r and not first_r_chunk_found:
-            cells.extend([RPY2_MD, RPY2_CODE, DRIVE_MD, DRIVE_CODE, SEPARATOR])
+            cells.extend(SETUP_CELLS)
             first_r_chunk_found = True
 
         if is_r:
             source = ["%%R"]
             source.extend(option_comments)
-            if code:
+            if code_lines:
                 source.append("")
-                source.extend(code.splitlines())
+                source.extend(code_lines)
             cell = {
                 "cell_type": "code",
                 "metadata": {},
@@ -138,7 +243,7 @@ def qmd_to_cells(content: str):
                 "execution_count": None
             }
         else:
-            source = [f"```{engine}"] + code.splitlines() + ["```"]
+            source = [f"```{engine}", *code_lines, "```"]
             cell = {
                 "cell_type": "code",
                 "metadata": {},
@@ -147,50 +252,111 @@ def qmd_to_cells(content: str):
                 "execution_count": None
             }
 
-        cells.append(ensure_code_cell_structure(cell))
-        pos = m.end()
+        cells.append(cell)
+        pos = end
 
     # Remaining markdown
     final_md = content[pos:].strip()
     if final_md:
-        for block in split_headings(final_md.splitlines()):
-            if block.strip():
-                cells.append({
-                    "cell_type": "markdown",
-                    "metadata": {},
-                    "source": block.splitlines()
-                })
+        for block_lines in split_headings(final_md):
+            cells.append({
+                "cell_type": "markdown",
+                "metadata": {},
+                "source": block_lines
+            })
 
     return cells
 
 # ------------------- Convert single file -------------------
-def convert_file(in_path: Path, out_path: Path):
+def convert_file(in_path: Path, out_path: Path, cached=None):
+    """Convert one source; returns its new cache entry, or None on failure.
+
+    cached is the entry from the previous run. When it was written by this
+    converter version, the source hash matches and the output is untouched
+    since then, the conversion is skipped.
+    """
     try:
-        content = in_path.read_text(encoding="utf-8")
-        cells = qmd_to_cells(content)
-
-        notebook = {
-            "cells": cells,
-            "metadata": {
-                "kernelspec": {"display_name": "R", "language": "R", "name": "ir"},
-                "colab": {"toc_visible": True}
-            },
-            "nbformat": 4,
-            "nbformat_minor": 5
-        }
-
-        out_path.write_text(
-            json.dumps(notebook, indent=1, ensure_ascii=False, separators=(',', ':')),
-            encoding="utf-8"
-        )
+        raw = in_path.read_bytes()
+        digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+        if (cached and cached.get("version") == CONVERTER_VERSION
+                and cached.get("hash") == digest
+                and cached.get("mtime") == output_mtime(out_path)):
+            print(f"Unchanged: {in_path.name} → {out_path.name}")
+            return cached
+
+        content = raw.decode("utf-8")
+        if "\r" in content:  # read_text's universal-newline translation
+            content = content.replace("\r\n", "\n").replace("\r", "\n")
+        out_path.write_bytes(dump_notebook(qmd_to_cells(content)))
         print(f"Success: {in_path.name} → {out_path.name}")
+        return {"version": CONVERTER_VERSION, "hash": digest, "mtime": output_mtime(out_path)}
     except Exception as e:
         print(f"Failed: {in_path.name} | {e}")
+        return None
+
+# ------------------- Conversion cache -------------------
+CACHE_FILE = ".convcache.json"
+# Entries from a different converter (this file changed) are never reused
+CONVERTER_VERSION = hashlib.blake2b(Path(__file__).read_bytes(), digest_size=8).hexdigest()
+
+def output_mtime(path: Path):
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+def load_cache(out_dir: Path) -> dict:
+    """Read {source path: {"version", "hash", "mtime"}} from out_dir.
+
+    Missing or unreadable files give an empty cache; malformed entries are dropped.
+    """
+    try:
+        raw = (out_dir / CACHE_FILE).read_bytes()
+        cache = orjson.loads(raw) if orjson is not None else json.loads(raw.decode("utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict):
+        return {}
+    return {k: e for k, e in cache.items() if isinstance(e, dict)}
+
+def save_cache(out_dir: Path, cache: dict):
+    (out_dir / CACHE_FILE).write_bytes(dumps(cache))
 
 # ------------------- Slugify filename -------------------
+SLUG_STRIP_RE = re.compile(r"[^\w\s-]")
+SLUG_SPACE_RE = re.compile(r"\s+")
+# ASCII fast path: delete everything that is not \w, \s or '-'
+SLUG_ASCII_TABLE = str.maketrans({
+    chr(c): None for c in range(128)
+    if not (chr(c).isalnum() or chr(c) in "_-" or chr(c).isspace())
+})
+
 def slug(name: str) -> str:
-    name = re.sub(r"[^\w\s-]", "", name.lower())
-    return re.sub(r"\s+", "_", name).strip("_") + ".ipynb"
+    name = name.lower()
+    if name.isascii():
+        name = "_".join(name.translate(SLUG_ASCII_TABLE).split())
+    else:
+        name = SLUG_SPACE_RE.sub("_", SLUG_STRIP_RE.sub("", name))
+    return name.strip("_") + ".ipynb"
+
+# ------------------- Worker -------------------
+def convert_one(in_path: Path, cached, out_dir: Path):
+    """Top-level (picklable) unit of work for the process pool."""
+    return convert_file(in_path, out_dir / slug(in_path.stem), cached)
+
+# ------------------- Find source files -------------------
+def iter_sources(root):
+    """Yield .qmd/.Rmd files under root in a single scandir walk."""
+    try:
+        it = os.scandir(root)
+    except OSError:  # missing or unreadable directory: skip it, like rglob
+        return
+    with it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_sources(entry.path)
+            elif entry.name.endswith((".qmd", ".Rmd")):
+                yield Path(entry.path)
 
 # ------------------- Main -------------------
 def main():
@@ -202,14 +368,30 @@ def main():
     out_dir = Path(out)
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    files = list(in_dir.rglob("*.qmd")) + list(in_dir.rglob("*.Rmd"))
+    files = sorted(iter_sources(in_dir)) if in_dir.is_dir() else []
     if not files:
         print("No .qmd or .Rmd files found.")
         return
 
+    # Sources slugging to the same output name would race in the pool; keep the
+    # serial behaviour (last in sorted order wins) and skip the others
+    by_output = {}
+    for f in files:
+        name = slug(f.stem)
+        if name in by_output:
+            print(f"Skipped: {by_output[name]} (same output {name} as {f})")
+        by_output[name] = f
+    files = list(by_output.values())
+
+    # Workers only report entries back; the parent owns and persists the cache
+    cache = load_cache(out_dir)
+    keys = [str(f.resolve()) for f in files]
+
     print(f"\nConverting {len(files)} file(s)...\n")
-    for f in sorted(files):
-        convert_file(f, out_dir / slug(f.stem))
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+        entries = ex.map(partial(convert_one, out_dir=out_dir),
+                         files, [cache.get(k) for k in keys], chunksize=4)
+        save_cache(out_dir, {k: e for k, e in zip(keys, entries) if e})
 
     print(f"\nAll done! Output → {out_dir.resolve()}")
 
@@ -3,12 +3,29 @@ import json
 from pathlib import Path
 import re
 
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib parser
+    orjson = None
+
+# Markers identifying the two R setup blocks to replace
+INSTALL_MARKERS = ('Install missing packages', 'installed.packages()', 'install.packages(new_packages')
+INSTALL_ALT_MARKER = 'install.packages(new.packages'
+LIBLOAD_MARKERS = ('Load packages with suppressed messages', 'invisible(lapply', 'suppressPackageStartupMessages')
+BLOCK_WINDOW = 10  # lines scanned after a %%R line
+
+
+def window_has(lines, start, marker):
+    """True if marker occurs in one of the BLOCK_WINDOW lines starting at start."""
+    return any(marker in lines[j] for j in range(start, min(start + BLOCK_WINDOW, len(lines))))
+
+
 def normalize_whitespace(text):
     return re.sub(r'\s+', ' ', text.strip())
 
 def process_notebook(filepath: Path):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        nb = json.load(f)
+    raw = Path(filepath).read_bytes()
+    nb = orjson.loads(raw) if orjson is not None else json.loads(raw.decode('utf-8'))
 
     changed = False
 
@@ -31,12 +48,9 @@ def process_notebook(filepath: Path):
 
             # 2. & 3. Look for the two R blocks (very tolerant matching)
             if i + 6 < len(lines) and lines[i].strip() == '%%R':
-                block = ''.join(lines[i:i+10])  # grab enough lines
-
                 # — Install packages block —
-                if ('Install missing packages' in block and 
-                    'installed.packages()' in block and 
-                    'install.packages(new_packages' in block or 'install.packages(new.packages' in block):
+                if (all(window_has(lines, i, m) for m in INSTALL_MARKERS) or
+                    window_has(lines, i, INSTALL_ALT_MARKER)):
 
                     print(f"  → Found & replacing install block in {filepath.name}")
                     new_lines.extend([
@@ -54,9 +68,7 @@ def process_notebook(filepath: Path):
                     continue
 
                 # — Library loading block —
-                if ('Load packages with suppressed messages' in block and 
-                    'invisible(lapply' in block and 
-                    'suppressPackageStartupMessages' in block):
+                if all(window_has(lines, i, m) for m in LIBLOAD_MARKERS):
 
                     print(f"  → Found & replacing library block in {filepath.name}")
                     new_lines.extend([
@@ -82,7 +94,8 @@ def process_notebook(filepath: Path):
         cell['source'] = new_lines
 
     if changed:
-        # Jupyter standard: indent=1 + trailing newline
+        # Jupyter standard: indent=1 + trailing newline (orjson only does
+        # 2-space indents, so the write stays on the stdlib encoder)
         with open(filepath, 'w', encoding='utf-8', newline='\n') as f:
             json.dump(nb, f, ensure_ascii=False, indent=1)
             f.write('\n')
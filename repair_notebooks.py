@@ -7,15 +7,22 @@ Usage: python repair_all_notebooks.py [directory]
 """
 
 import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib parser/encoder
+    orjson = None
+
 def repair_notebook(file_path: Path) -> bool:
     """Repair a single notebook file."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except json.JSONDecodeError as e:
+        raw = Path(file_path).read_bytes()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw.decode('utf-8'))
+    except json.JSONDecodeError as e:  # orjson.JSONDecodeError subclasses this
         print(f"❌ [JSON ERROR] {file_path}: {e}")
         return False
     except Exception as e:
@@ -39,9 +46,12 @@ def repair_notebook(file_path: Path) -> bool:
 
     if fixed:
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                # Use compact JSON like Jupyter does
-                json.dump(data, f, separators=(',', ':'), ensure_ascii=False)
+            # Use compact JSON like Jupyter does (orjson is compact by default)
+            if orjson is not None:
+                payload = orjson.dumps(data)
+            else:
+                payload = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+            Path(file_path).write_bytes(payload)
             print(f"✅ [FIXED] {file_path}")
         except Exception as e:
             print(f"❌ [WRITE ERROR] {file_path}: {e}")
@@ -50,22 +60,33 @@ def repair_notebook(file_path: Path) -> bool:
         print(f"✔️ [OK] {file_path}")
     return True
 
+def iter_notebooks(root):
+    """Yield .ipynb files under root in a single scandir walk."""
+    try:
+        it = os.scandir(root)
+    except OSError:  # missing or unreadable directory: skip it, like rglob
+        return
+    with it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_notebooks(entry.path)
+            elif entry.name.endswith(".ipynb"):
+                yield Path(entry.path)
+
 def main(target_dir: str = "."):
     root = Path(target_dir).resolve()
     if not root.is_dir():
         print(f"❌ Error: '{target_dir}' is not a valid directory.")
         sys.exit(1)
 
-    notebook_files = list(root.rglob("*.ipynb"))
+    notebook_files = list(iter_notebooks(root))
     if not notebook_files:
         print(f"ℹ️ No .ipynb files found in '{root}'.")
         return
 
     print(f"🔧 Found {len(notebook_files)} notebook(s) in '{root}'. Repairing...\n")
-    success_count = 0
-    for nb_file in notebook_files:
-        if repair_notebook(nb_file):
-            success_count += 1
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+        success_count = sum(ex.map(repair_notebook, notebook_files, chunksize=4))
 
     print(f"\n✅ Repaired {success_count}/{len(notebook_files)} notebooks.")
 
@@ -9,22 +9,30 @@ import argparse
 from pathlib import Path
 import nbformat as nbf
 
+_LAYOUT_RE = re.compile(r":::\s*\{layout-ncol=\"3\"\}.*?:::", re.DOTALL)
+# str.splitlines() boundaries other than \n (\r is translated on read)
+_LINE_BREAK_RE = re.compile(r"[\x0b\x0c\x1c-\x1e\x85\u2028\u2029]")
+_HASHPIPE_LINE_RE = re.compile(r"^[^\S\n]*#\|[^\n]*\n?", re.MULTILINE)
+_CHUNK_START_RE = re.compile(r"^```{(\w+)}")
+_CHUNK_END_RE = re.compile(r"^```$")
+
 
 def remove_knitr_quarto_options(content: str) -> str:
     """Remove Quarto/knitr option lines starting with '#|'."""
-    lines = content.splitlines()
-    return "\n".join(line for line in lines if not line.strip().startswith("#|"))
+    content = _HASHPIPE_LINE_RE.sub("", _LINE_BREAK_RE.sub("\n", content))
+    # Same text as joining the kept lines with "\n": drop the final line break
+    return content[:-1] if content.endswith("\n") else content
 
 
 def remove_layout_block(content: str) -> str:
     """Remove the specific ::: {layout-ncol="3"} block with image links."""
-    pattern = r":::\s*\{layout-ncol=\"3\"\}.*?:::"
-    return re.sub(pattern, "", content, flags=re.DOTALL)
+    return _LAYOUT_RE.sub("", content)
 
 
 def convert_qmd_to_ipynb(qmd_path: Path, output_dir: Path):
-    with open(qmd_path, "r", encoding="utf-8") as f:
-        content = f.read()
+    content = qmd_path.read_bytes().decode("utf-8")
+    if "\r" in content:  # text-mode open()'s universal-newline translation
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
 
     # Apply cleaning rules
     content = remove_layout_block(content)
@@ -41,12 +49,12 @@ def convert_qmd_to_ipynb(qmd_path: Path, output_dir: Path):
     lines = content.splitlines()
     i = 0
     first_r_seen = False
-    chunk_start_re = re.compile(r"^```{(\w+)}")
-    chunk_end_re = re.compile(r"^```$")
+    chunk_start = _CHUNK_START_RE.match
+    chunk_end = _CHUNK_END_RE.match
 
     while i < len(lines):
         line = lines[i].rstrip()
-        start_match = chunk_start_re.match(line)
+        start_match = chunk_start(line)
 
         if start_match:
             lang = start_match.group(1)
@@ -54,7 +62,7 @@ def convert_qmd_to_ipynb(qmd_path: Path, output_dir: Path):
             code_lines = []
             while i < len(lines):
                 l = lines[i].rstrip()
-                if chunk_end_re.match(l):
+                if chunk_end(l):
                     break
                 code_lines.append(lines[i])  # keep original, including indent
                 i += 1
@@ -83,7 +91,7 @@ drive.mount('/content/drive')'''
             md_lines = []
             while i < len(lines):
                 l = lines[i].rstrip()
-                if chunk_start_re.match(l):
+                if chunk_start(l):
                     break
                 md_lines.append(lines[i])
                 i += 1
@@ -1,11 +1,17 @@
 import json
 
-with open('/home/zia207/Dropbox/WebSites/R_Website/Survival_Analysis_R/Colab_Notebook/02_07_01_01_survival_analysis_kaplan_meier_r.ipynb', 'r', encoding='utf-8') as f:
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
+
+with open('/home/zia207/Dropbox/WebSites/R_Website/Survival_Analysis_R/Colab_Notebook/02_07_01_01_survival_analysis_kaplan_meier_r.ipynb', 'rb') as f:
     content = f.read()
 
 # Try to parse
 try:
-    data = json.loads(content)
+    data = loads(content)
     print("✅ Valid JSON")
 except json.JSONDecodeError as e:
     print(f"❌ Invalid JSON at line {e.lineno}, col {e.colno}: {e.msg}")